@@ -7,12 +7,27 @@ from flask_cors import CORS
 from lr0_algorithm import LR0ParserGenerator
 from slr1_algorithm import SLR1ParserGenerator
 from lr0_parser import LR0Parser
+from collections import OrderedDict
 import json
 import re
+import threading
 
 app = Flask(__name__)
 CORS(app)
 
+# Number of compiled grammars /api/parse keeps between requests
+COMPILE_CACHE_SIZE = 16
+# Parsers with more ACTION cells (states x terminals) than this are rebuilt
+# per request instead of cached, since each keeps dense table rows
+COMPILE_CACHE_MAX_CELLS = 100000
+
+# A production line: left -> right (split on the first arrow)
+_LINE_RE = re.compile(r'^\s*(.*?)\s*->\s*(.*?)\s*$')
+# A grammar symbol: a whitespace-free run, where quoted parts may contain
+# whitespace. Either quote character opens a quoted part and either one
+# closes it; an unterminated quote runs to the end of the production
+_TOKEN_RE = re.compile(r'(?:["\'][^"\']*["\']?|[^\s"\'])+')
+
 
 def parse_grammar_input(grammar_text: str) -> dict:
     """
@@ -33,12 +48,11 @@ def parse_grammar_input(grammar_text: str) -> dict:
             continue
         
         # Split by ->
-        if '->' not in line:
+        match = _LINE_RE.match(line)
+        if not match:
             continue
         
-        parts = line.split('->', 1)
-        left = parts[0].strip()
-        right = parts[1].strip()
+        left, right = match.groups()
         
         # Split multiple productions by |
         productions = [p.strip() for p in right.split('|')]
@@ -53,23 +67,7 @@ def parse_grammar_input(grammar_text: str) -> dict:
                 symbols = []
             else:
                 # Split by whitespace, but preserve quoted strings
-                symbols = []
-                current = ''
-                in_quotes = False
-                
-                for char in prod:
-                    if char == '"' or char == "'":
-                        in_quotes = not in_quotes
-                        current += char
-                    elif char.isspace() and not in_quotes:
-                        if current:
-                            symbols.append(current)
-                            current = ''
-                    else:
-                        current += char
-                
-                if current:
-                    symbols.append(current)
+                symbols = _TOKEN_RE.findall(prod)
             
             grammar[left].append(symbols)
     
@@ -109,6 +107,79 @@ def generate_parser():
         return jsonify({'error': str(e)}), 500
 
 
+def _normalize_grammar_text(grammar_text: str) -> str:
+    """Normalize grammar text for use as a cache key (blank lines and
+    surrounding whitespace on a line don't change the grammar)."""
+    lines = (line.strip() for line in grammar_text.strip().split('\n'))
+    return '\n'.join(line for line in lines if line)
+
+
+# (normalized grammar text, parser type) -> _compile result, least
+# recently used first
+_compile_cache: 'OrderedDict[tuple, tuple]' = OrderedDict()
+_compile_cache_lock = threading.Lock()
+
+
+def _compile(grammar_text: str, parser_type: str):
+    """
+    Generate parsing tables and build a parser for a grammar.
+    
+    The last COMPILE_CACHE_SIZE results are cached per (normalized grammar
+    text, parser type), since table generation dominates the cost of
+    /api/parse and the same grammar is usually parsed against many inputs.
+    Invalid grammars and parsers above COMPILE_CACHE_MAX_CELLS are not kept.
+    
+    Returns:
+        None if the grammar text is not in a valid format, otherwise
+        (error_msg, conflicts, parser, parser_lock). For a grammar with
+        conflicts, parser is None and conflicts holds the 'shift_reduce' and
+        'reduce_reduce' lists; otherwise conflicts is None. LR0Parser keeps
+        per-parse state, so calls to parser.parse() must hold parser_lock.
+    """
+    key = (grammar_text, parser_type)
+    with _compile_cache_lock:
+        compiled = _compile_cache.get(key)
+        if compiled is not None:
+            _compile_cache.move_to_end(key)
+            return compiled
+    
+    # Parse grammar
+    grammar = parse_grammar_input(grammar_text)
+    
+    if not grammar:
+        return None
+    
+    # Generate parser tables based on type
+    if parser_type == 'slr1':
+        generator = SLR1ParserGenerator(grammar)
+        tables_result = generator.generate(fail_fast=True, include_display=False)
+        is_valid = tables_result.get('is_slr1', False)
+        error_msg = 'Grammar is not SLR(1). Cannot parse with conflicts.'
+    else:
+        generator = LR0ParserGenerator(grammar)
+        tables_result = generator.generate(fail_fast=True, include_display=False)
+        is_valid = tables_result.get('is_lr0', False)
+        error_msg = 'Grammar is not LR(0). Cannot parse with conflicts.'
+    
+    if not is_valid:
+        conflicts = {
+            'shift_reduce': tables_result['shift_reduce_conflicts'],
+            'reduce_reduce': tables_result['reduce_reduce_conflicts']
+        }
+        return error_msg, conflicts, None, None
+    
+    # Create parser directly from the generator's tables
+    parser = LR0Parser(*generator.parser_tables())
+    compiled = (error_msg, None, parser, threading.Lock())
+    
+    if len(generator.states) * (len(generator.terminals) + 1) <= COMPILE_CACHE_MAX_CELLS:
+        with _compile_cache_lock:
+            _compile_cache[key] = compiled
+            if len(_compile_cache) > COMPILE_CACHE_SIZE:
+                _compile_cache.popitem(last=False)
+    return compiled
+
+
 @app.route('/api/parse', methods=['POST'])
 def parse_input():
     """Parse input string using generated LR(0) or SLR(1) parsing tables."""
@@ -124,57 +195,26 @@ def parse_input():
         if input_string is None or input_string == '':
             return jsonify({'error': 'Input string is required'}), 400
         
-        # Parse grammar
-        grammar = parse_grammar_input(grammar_text)
+        compiled = _compile(
+            _normalize_grammar_text(grammar_text),
+            'slr1' if parser_type == 'slr1' else 'lr0'
+        )
         
-        if not grammar:
+        if compiled is None:
             return jsonify({'error': 'Invalid grammar format'}), 400
         
-        # Generate parser tables based on type
-        if parser_type == 'slr1':
-            generator = SLR1ParserGenerator(grammar)
-            tables_result = generator.generate()
-            is_valid = tables_result.get('is_slr1', False)
-            error_msg = 'Grammar is not SLR(1). Cannot parse with conflicts.'
-        else:
-            generator = LR0ParserGenerator(grammar)
-            tables_result = generator.generate()
-            is_valid = tables_result.get('is_lr0', False)
-            error_msg = 'Grammar is not LR(0). Cannot parse with conflicts.'
+        error_msg, conflicts, parser, parser_lock = compiled
         
         # Check if grammar is valid
-        if not is_valid:
+        if parser is None:
             return jsonify({
                 'error': error_msg,
-                'conflicts': {
-                    'shift_reduce': tables_result['shift_reduce_conflicts'],
-                    'reduce_reduce': tables_result['reduce_reduce_conflicts']
-                }
+                'conflicts': conflicts
             }), 400
         
-        # Convert action table format
-        action_table = {}
-        for state, symbols in tables_result['action_table'].items():
-            for symbol, action in symbols.items():
-                action_table[(state, symbol)] = action
-        
-        # Convert goto table format
-        goto_table = {}
-        for state, non_terminals in tables_result['goto_table'].items():
-            for non_terminal, next_state in non_terminals.items():
-                goto_table[(state, non_terminal)] = next_state
-        
-        # Create parser
-        parser = LR0Parser(
-            action_table=action_table,
-            goto_table=goto_table,
-            productions=generator.productions,
-            terminals=tables_result['terminals'][:-1],  # Remove '$'
-            start_symbol=generator.augmented_start
-        )
-        
         # Parse input
-        result = parser.parse(input_string)
+        with parser_lock:
+            result = parser.parse(input_string, record_steps=True)
         
         return jsonify(result)
     
@@ -10,16 +10,23 @@ Implements the complete LR(0) algorithm including:
 - Conflict detection
 """
 
-from typing import List, Dict, Set, Tuple, Optional, Any
-from collections import defaultdict, OrderedDict
+from typing import List, Dict, Set, FrozenSet, Tuple, Optional, Any
+from collections import defaultdict, deque, OrderedDict
+from operator import attrgetter
 from dataclasses import dataclass, field
 
 
+# Number of conflicts after which fail-fast table construction stops
+FAIL_FAST_CONFLICT_LIMIT = 10
+
+
 @dataclass
 class Production:
     """Represents a grammar production rule."""
     left: str  # Non-terminal
     right: List[str]  # Right-hand side (list of symbols)
+    right_ids: Tuple[int, ...] = field(default=(), compare=False, repr=False)  # Interned ids of right, set by the generator
+    index: int = field(default=-1, compare=False, repr=False)  # Position in the generator's productions
     
     def __str__(self):
         return f"{self.left} → {' '.join(self.right) if self.right else 'ε'}"
@@ -31,39 +38,131 @@ class Production:
         return isinstance(other, Production) and self.left == other.left and self.right == other.right
 
 
-@dataclass
+@dataclass(frozen=True)
 class LR0Item:
     """Represents an LR(0) item with a dot position."""
     production: Production
     dot_position: int  # Position of dot in the right-hand side
+    # Derived from the two fields above once, at construction
+    next_sym: Optional[str] = field(init=False, repr=False, compare=False)  # Symbol after the dot, or None
+    is_reduce: bool = field(init=False, repr=False, compare=False)  # Dot at the end
+    production_index: int = field(init=False, repr=False, compare=False)  # production.index
+    # Display form, and the order items are listed in for display
+    _str: str = field(init=False, repr=False, compare=False)
+    _sort_key: Tuple[str, int, str] = field(init=False, repr=False, compare=False)
     
-    def __str__(self):
-        rhs = self.production.right.copy()
-        rhs.insert(self.dot_position, '•')
-        rhs_str = ' '.join(rhs) if rhs else '•'
-        return f"{self.production.left} → {rhs_str}"
-    
-    def __hash__(self):
-        return hash((self.production, self.dot_position))
+    def __post_init__(self):
+        right = self.production.right
+        next_sym = right[self.dot_position] if self.dot_position < len(right) else None
+        object.__setattr__(self, 'next_sym', next_sym)
+        object.__setattr__(self, 'is_reduce', next_sym is None)
+        object.__setattr__(self, 'production_index', self.production.index)
+        
+        before = ' '.join(right[:self.dot_position])
+        after = ' '.join(right[self.dot_position:])
+        rhs_str = ' '.join(filter(None, (before, '•', after)))
+        item_str = f"{self.production.left} → {rhs_str}"
+        object.__setattr__(self, '_str', item_str)
+        object.__setattr__(self, '_sort_key', (self.production.left, self.dot_position, item_str))
     
-    def __eq__(self, other):
-        return isinstance(other, LR0Item) and \
-               self.production == other.production and \
-               self.dot_position == other.dot_position
+    def __str__(self):
+        return self._str
     
     def is_reduce_item(self) -> bool:
         """Check if this is a reduce item (dot at the end)."""
-        return self.dot_position >= len(self.production.right)
+        return self.is_reduce
     
     def is_accept_item(self) -> bool:
         """Check if this is an accept item (S' → S•)."""
-        return self.production.left == "S'" and self.is_reduce_item()
+        return self.is_reduce and self.production.left == "S'"
     
     def next_symbol(self) -> Optional[str]:
         """Get the symbol after the dot, or None if dot is at the end."""
-        if self.dot_position < len(self.production.right):
-            return self.production.right[self.dot_position]
-        return None
+        return self.next_sym
+
+
+def _mask_ids(mask: int) -> List[int]:
+    """Ids of the set bits of an item bitmask, lowest first."""
+    ids = []
+    while mask:
+        low_bit = mask & -mask
+        ids.append(low_bit.bit_length() - 1)
+        mask ^= low_bit
+    return ids
+
+
+def _close_mask(kernel: int, item_next: List[int], nt_closure: List[int],
+                cache: Dict[int, int]) -> int:
+    """
+    Compute the closure of an item bitmask.
+    
+    nt_closure[B] already holds every item predicted (transitively) by B, so
+    only the non-terminals after the dot in the kernel's own items need to be
+    looked at. Results are memoized in cache, since the same kernel is reached
+    from many (state, symbol) pairs while building the DFA.
+    """
+    closed = cache.get(kernel)
+    if closed is None:
+        closed = kernel
+        num_non_terminals = len(nt_closure)
+        for item_id in _mask_ids(kernel):
+            next_id = item_next[item_id]
+            if 0 <= next_id < num_non_terminals:
+                closed |= nt_closure[next_id]
+        cache[kernel] = closed
+    return closed
+
+
+def _build_state_masks(start_kernel: int, items_before: List[int], item_next: List[int],
+                       nt_closure: List[int], sym_rank: List[Tuple[int, str]], cache: Dict[int, int]
+                       ) -> Tuple[List[int], List[Tuple[int, int, int]]]:
+    """
+    Breadth-first construction of the LR(0) DFA over item bitmasks.
+    
+    Only ints and lists are touched here, so the whole loop runs on local
+    variables. Moving the dot over symbol X is a left shift of the items
+    with the dot before X, because items of a production are numbered
+    consecutively. Each state's outgoing symbols are read off its own items
+    and taken in sym_rank order, which makes state numbering deterministic.
+    
+    Returns:
+        (state_masks, transitions) where transitions holds
+        (from_state, symbol_id, to_state) in creation order
+    """
+    I0 = _close_mask(start_kernel, item_next, nt_closure, cache)
+    state_masks = [I0]
+    state_index = {I0: 0}
+    transitions = []
+    
+    # Each state index is enqueued exactly once, when it is first created
+    state_queue = deque([0])
+    
+    while state_queue:
+        state_idx = state_queue.popleft()
+        current_state = state_masks[state_idx]
+        
+        # Symbols after a dot in this state (-1 marks reduce items)
+        next_ids = {item_next[item_id] for item_id in _mask_ids(current_state)}
+        next_ids.discard(-1)
+        
+        # Compute GOTO for each symbol: move the dot over it and close
+        for sym_id in sorted(next_ids, key=sym_rank.__getitem__):
+            kernel = current_state & items_before[sym_id]
+            new_state = _close_mask(kernel << 1, item_next, nt_closure, cache)
+            
+            # Check if this state already exists
+            existing_idx = state_index.get(new_state)
+            if existing_idx is None:
+                # New state
+                existing_idx = len(state_masks)
+                state_masks.append(new_state)
+                state_index[new_state] = existing_idx
+                state_queue.append(existing_idx)
+            
+            # Record transition
+            transitions.append((state_idx, sym_id, existing_idx))
+    
+    return state_masks, transitions
 
 
 class LR0ParserGenerator:
@@ -90,15 +189,28 @@ class LR0ParserGenerator:
         
         # Augment grammar
         self._augment_grammar()
+        self._intern_symbols()
+        
+        # Production -> index lookup
+        for idx, prod in enumerate(self.productions):
+            prod.index = idx
+        self._prod_index: Dict[Production, int] = {prod: idx for idx, prod in enumerate(self.productions)}
+        self._reduce_action: List[str] = [f"r{idx}" for idx in range(len(self.productions))]
         
         # LR(0) items and states
         self.items: List[LR0Item] = []
-        self.states: List[Set[LR0Item]] = []
+        self._enumerate_items()
+        self.states: List[FrozenSet[LR0Item]] = []
+        self._state_masks: List[int] = []  # Bitmask form of self.states
+        self._closure_cache: Dict[int, int] = {}  # kernel mask -> closure mask
         self.goto_map: Dict[Tuple[int, str], int] = {}  # (state, symbol) -> next_state
+        # Per state: {'shifts': {terminal: state}, 'gotos': {non_terminal: state},
+        # 'reduces': [production index, ...] (sorted, without S' → S), 'accept': bool}
+        self._state_summary: List[Dict[str, Any]] = []
         
         # Parsing tables
-        self.action_table: Dict[Tuple[int, str], str] = {}  # (state, terminal) -> action
-        self.goto_table: Dict[Tuple[int, str], int] = {}  # (state, non_terminal) -> state
+        self.action_table: Dict[int, Dict[str, str]] = defaultdict(dict)  # state -> {terminal: action}
+        self.goto_table: Dict[int, Dict[str, int]] = defaultdict(dict)  # state -> {non_terminal: state}
         
         # Conflict tracking
         self.shift_reduce_conflicts: List[Dict[str, Any]] = []
@@ -113,14 +225,22 @@ class LR0ParserGenerator:
         # Find start symbol (first non-terminal in grammar)
         self.start_symbol = list(self.original_grammar.keys())[0]
         
+        # Skip repeated alternatives: duplicates only add identical items
+        seen: Set[Tuple[str, Tuple[str, ...]]] = set()
+        
         for left, right_sides in self.original_grammar.items():
             self.non_terminals.add(left)
             for right in right_sides:
                 # Handle epsilon (empty production)
                 if right == ['ε'] or right == []:
-                    self.productions.append(Production(left, []))
-                else:
-                    self.productions.append(Production(left, right))
+                    right = []
+                key = (left, tuple(right))
+                if key in seen:
+                    continue
+                seen.add(key)
+                
+                prod = Production(left, list(right))
+                self.productions.append(prod)
     
     def _extract_symbols(self):
         """Extract all terminals and non-terminals from the grammar."""
@@ -136,253 +256,322 @@ class LR0ParserGenerator:
         self.productions.insert(0, augmented_prod)
         self.non_terminals.add(self.augmented_start)
     
-    def closure(self, items: Set[LR0Item]) -> Set[LR0Item]:
+    def _intern_symbols(self):
         """
-        Compute the closure of a set of LR(0) items.
+        Assign every symbol a dense integer id.
         
-        Closure rule: If A → α•Bβ is in closure, and B → γ is a production,
-        then add B → •γ to closure.
+        Non-terminals get the ids below _num_non_terminals, so a symbol id can
+        be classified without a set lookup. Each production's right_ids is
+        filled in from the resulting table.
         """
-        closure_set = set(items)
-        changed = True
+        non_terminals = [self.augmented_start] + [
+            nt for nt in self.original_grammar if nt != self.augmented_start
+        ]
+        self._id_sym: List[str] = non_terminals + sorted(self.terminals)
+        self._sym_id: Dict[str, int] = {sym: idx for idx, sym in enumerate(self._id_sym)}
+        self._num_non_terminals: int = len(non_terminals)
+        
+        # Symbol id -> sort key for DFA construction order:
+        # start symbol first, then other non-terminals, then terminals
+        self._sym_rank: List[Tuple[int, str]] = [
+            (0 if sym == self.start_symbol else 1 if idx < self._num_non_terminals else 2, sym)
+            for idx, sym in enumerate(self._id_sym)
+        ]
+        
+        for prod in self.productions:
+            prod.right_ids = tuple(self._sym_id[sym] for sym in prod.right)
+    
+    def _enumerate_items(self):
+        """
+        Number every LR(0) item so that item sets can be stored as bitmasks.
+        
+        Items of one production get consecutive ids, so moving the dot over a
+        symbol is a left shift by one.
+        """
+        self.items = []
+        self._item_id: Dict[Tuple[int, int], int] = {}  # (production index, dot) -> item id
+        self._items_before: List[int] = [0] * len(self._id_sym)  # symbol id -> items with dot before it
+        self._item_next: List[int] = []  # item id -> symbol id after the dot, or -1
+        self._initial_mask: List[int] = [0] * self._num_non_terminals  # non-terminal id -> B → •γ items
+        
+        for prod_idx, prod in enumerate(self.productions):
+            for dot in range(len(prod.right) + 1):
+                item_id = len(self.items)
+                self.items.append(LR0Item(prod, dot))
+                self._item_id[(prod_idx, dot)] = item_id
+                if dot < len(prod.right):
+                    self._items_before[prod.right_ids[dot]] |= 1 << item_id
+                    self._item_next.append(prod.right_ids[dot])
+                else:
+                    self._item_next.append(-1)
         
+        for prod in self.productions:
+            nt_id = self._sym_id[prod.left]
+            self._initial_mask[nt_id] |= 1 << self._item_id[(prod.index, 0)]
+        
+        self._compute_nt_closures()
+    
+    def _compute_nt_closures(self):
+        """
+        Precompute, for each non-terminal B, every B' → •γ item that closure
+        adds once B is predicted.
+        
+        B predicts C whenever some B-production starts with C; the set of
+        non-terminals reachable that way (including B itself) is found with a
+        fixpoint over non-terminal bitmasks.
+        """
+        num_non_terminals = self._num_non_terminals
+        starts_with: List[Set[int]] = [set() for _ in range(num_non_terminals)]
+        for prod in self.productions:
+            if prod.right_ids and prod.right_ids[0] < num_non_terminals:
+                starts_with[self._sym_id[prod.left]].add(prod.right_ids[0])
+        
+        reachable = [1 << nt_id for nt_id in range(num_non_terminals)]
+        changed = True
         while changed:
             changed = False
-            new_items = set()
-            
-            for item in closure_set:
-                next_sym = item.next_symbol()
-                if next_sym and next_sym in self.non_terminals:
-                    # Add all productions of this non-terminal with dot at start
-                    for prod in self.productions:
-                        if prod.left == next_sym:
-                            new_item = LR0Item(prod, 0)
-                            if new_item not in closure_set:
-                                new_items.add(new_item)
-                                changed = True
-            
-            closure_set.update(new_items)
+            for nt_id in range(num_non_terminals):
+                new_reachable = reachable[nt_id]
+                for first_id in starts_with[nt_id]:
+                    new_reachable |= reachable[first_id]
+                if new_reachable != reachable[nt_id]:
+                    reachable[nt_id] = new_reachable
+                    changed = True
+        
+        self._nt_closure: List[int] = []  # non-terminal id -> closure item mask
+        for nt_id in range(num_non_terminals):
+            mask = 0
+            for other_id in range(num_non_terminals):
+                if reachable[nt_id] >> other_id & 1:
+                    mask |= self._initial_mask[other_id]
+            self._nt_closure.append(mask)
+    
+    def _items_to_mask(self, items) -> int:
+        """Encode a collection of LR0Items as an item bitmask."""
+        mask = 0
+        for item in items:
+            mask |= 1 << self._item_id[(self._prod_index[item.production], item.dot_position)]
+        return mask
+    
+    def _mask_to_items(self, mask: int) -> FrozenSet[LR0Item]:
+        """Decode an item bitmask back into a set of LR0Items."""
+        items = self.items
+        result = []
+        while mask:
+            low_bit = mask & -mask
+            result.append(items[low_bit.bit_length() - 1])
+            mask ^= low_bit
+        return frozenset(result)
+    
+    def _closure_mask(self, kernel: int) -> int:
+        """Closure over item bitmasks (see _close_mask)."""
+        return _close_mask(kernel, self._item_next, self._nt_closure, self._closure_cache)
+    
+    def closure(self, items: FrozenSet[LR0Item]) -> FrozenSet[LR0Item]:
+        """
+        Compute the closure of a set of LR(0) items.
         
-        return closure_set
+        Closure rule: If A → α•Bβ is in closure, and B → γ is a production,
+        then add B → •γ to closure.
+        """
+        return self._mask_to_items(self._closure_mask(self._items_to_mask(items)))
     
-    def goto(self, items: Set[LR0Item], symbol: str) -> Set[LR0Item]:
+    def goto(self, items: FrozenSet[LR0Item], symbol: str) -> FrozenSet[LR0Item]:
         """
         Compute GOTO(I, X) where I is a set of items and X is a symbol.
         
         GOTO rule: Move dot over X and compute closure.
         """
-        goto_set = set()
-        
-        for item in items:
-            next_sym = item.next_symbol()
-            if next_sym == symbol:
-                # Move dot forward
-                new_item = LR0Item(item.production, item.dot_position + 1)
-                goto_set.add(new_item)
-        
-        return self.closure(goto_set)
+        sym_id = self._sym_id.get(symbol)
+        if sym_id is None:
+            return frozenset()
+        # Move dot forward
+        kernel = (self._items_to_mask(items) & self._items_before[sym_id]) << 1
+        return self._mask_to_items(self._closure_mask(kernel))
     
     def build_dfa(self):
         """Build the LR(0) DFA by constructing all states."""
+        id_sym = self._id_sym
+        
         # Initialize I0 with augmented start item
-        initial_item = LR0Item(self.productions[0], 0)
-        I0 = self.closure({initial_item})
-        
-        self.states = [I0]
-        self.goto_map = {}
-        state_queue = [0]
-        processed = set()
-        
-        while state_queue:
-            state_idx = state_queue.pop(0)
-            if state_idx in processed:
-                continue
-            processed.add(state_idx)
-            
-            current_state = self.states[state_idx]
-            
-            # Find all symbols that can be transitioned over
-            symbols = set()
-            for item in current_state:
-                next_sym = item.next_symbol()
-                if next_sym:
-                    symbols.add(next_sym)
-            
-            # Sort symbols to make state creation deterministic
-            # Process start symbol first, then other non-terminals, then terminals
-            def symbol_key(s):
-                if s == self.start_symbol:
-                    return (0, s)  # Start symbol first
-                elif s in self.non_terminals:
-                    return (1, s)  # Other non-terminals second
-                else:
-                    return (2, s)  # Terminals last
-            sorted_symbols = sorted(symbols, key=symbol_key)
-            
-            # Compute GOTO for each symbol
-            for symbol in sorted_symbols:
-                new_state = self.goto(current_state, symbol)
-                
-                if not new_state:
-                    continue
-                
-                # Check if this state already exists
-                existing_idx = None
-                for idx, existing_state in enumerate(self.states):
-                    # Compare sets - they are equal if they have the same items
-                    if len(existing_state) == len(new_state) and existing_state == new_state:
-                        existing_idx = idx
-                        break
-                
-                if existing_idx is None:
-                    # New state
-                    existing_idx = len(self.states)
-                    self.states.append(new_state)
-                    state_queue.append(existing_idx)
-                
-                # Record transition
-                self.goto_map[(state_idx, symbol)] = existing_idx
+        self._state_masks, transitions = _build_state_masks(
+            1 << self._item_id[(0, 0)],
+            self._items_before,
+            self._item_next,
+            self._nt_closure,
+            self._sym_rank,
+            self._closure_cache,
+        )
+        
+        self.goto_map = {
+            (state_idx, id_sym[sym_id]): next_state
+            for state_idx, sym_id, next_state in transitions
+        }
+        self.states = [self._mask_to_items(mask) for mask in self._state_masks]
+        self._summarize_states(transitions)
     
-    def build_parsing_tables(self):
-        """Build ACTION and GOTO parsing tables."""
-        self.action_table = {}
-        self.goto_table = {}
+    def _summarize_states(self, transitions: List[Tuple[int, int, int]]):
+        """
+        Split each state once into what build_parsing_tables needs, so the
+        table builders don't classify items themselves.
+        """
+        id_sym = self._id_sym
+        num_non_terminals = self._num_non_terminals
+        summaries = []
+        
+        for state in self.states:
+            reduces = set()
+            accept = False
+            for item in state:
+                if item.is_reduce:
+                    if item.is_accept_item():
+                        accept = True
+                    else:
+                        reduces.add(item.production_index)
+            summaries.append({'shifts': {}, 'gotos': {}, 'reduces': sorted(reduces), 'accept': accept})
+        
+        for state_idx, sym_id, next_state in transitions:
+            kind = 'gotos' if sym_id < num_non_terminals else 'shifts'
+            summaries[state_idx][kind][id_sym[sym_id]] = next_state
+        
+        self._state_summary = summaries
+    
+    def _has_enough_conflicts(self) -> bool:
+        """Check whether enough conflicts were collected to stop a fail-fast build."""
+        return len(self.shift_reduce_conflicts) + len(self.reduce_reduce_conflicts) >= FAIL_FAST_CONFLICT_LIMIT
+    
+    def build_parsing_tables(self, fail_fast: bool = False):
+        """
+        Build ACTION and GOTO parsing tables.
+        
+        Args:
+            fail_fast: Stop once the grammar is known not to be LR(0) and
+                       FAIL_FAST_CONFLICT_LIMIT conflicts have been collected.
+                       The tables are left incomplete in that case.
+        """
+        self.action_table = defaultdict(dict)
+        self.goto_table = defaultdict(dict)
         self.shift_reduce_conflicts = []
         self.reduce_reduce_conflicts = []
         self.is_lr0 = True
         
-        for state_idx, state in enumerate(self.states):
-            for item in state:
-                next_sym = item.next_symbol()
-                
-                if item.is_accept_item():
-                    # Accept action
-                    if (state_idx, '$') in self.action_table:
-                        # Conflict
-                        self.is_lr0 = False
-                    self.action_table[(state_idx, '$')] = 'accept'
-                
-                elif next_sym and next_sym in self.terminals:
-                    # Shift action
-                    next_state = self.goto_map.get((state_idx, next_sym))
-                    if next_state is not None:
-                        action_key = (state_idx, next_sym)
-                        if action_key in self.action_table:
-                            # Shift/Reduce conflict
-                            existing_action = self.action_table[action_key]
-                            if existing_action.startswith('r') and existing_action != 'accept':
-                                self.is_lr0 = False
-                                self.shift_reduce_conflicts.append({
-                                    'state': state_idx,
-                                    'symbol': next_sym,
-                                    'shift': f"s{next_state}",
-                                    'reduce': existing_action
-                                })
-                                # Keep shift (default resolution)
-                                self.action_table[action_key] = f"s{next_state}"
-                        else:
-                            self.action_table[action_key] = f"s{next_state}"
+        terminals_plus_end = tuple(sorted(self.terminals)) + ('$',)
+        reduce_rows: Dict[int, Dict[str, str]] = {}  # production index -> {terminal: rN}
+        
+        for state_idx, summary in enumerate(self._state_summary):
+            if fail_fast and not self.is_lr0 and self._has_enough_conflicts():
+                break
+            
+            # Shift actions
+            row: Dict[str, str] = {
+                terminal: f"s{next_state}" for terminal, next_state in summary['shifts'].items()
+            }
+            
+            # Reduce actions on every terminal (including $), in production
+            # order so conflict resolution doesn't depend on set ordering
+            for prod_idx in summary['reduces']:
+                reduce_action = self._reduce_action[prod_idx]
+                reduce_row = reduce_rows.get(prod_idx)
+                if reduce_row is None:
+                    reduce_row = dict.fromkeys(terminals_plus_end, reduce_action)
+                    reduce_rows[prod_idx] = reduce_row
                 
-                elif item.is_reduce_item() and not item.is_accept_item():
-                    # Reduce action (but not accept item - that's handled separately)
-                    prod_idx = self.productions.index(item.production)
-                    reduce_action = f"r{prod_idx}"
-                    
-                    # Add reduce action for all terminals (including $)
-                    for terminal in self.terminals:
-                        action_key = (state_idx, terminal)
-                        if action_key in self.action_table:
-                            existing_action = self.action_table[action_key]
-                            if existing_action.startswith('s'):
-                                # Shift/Reduce conflict
-                                self.is_lr0 = False
-                                self.shift_reduce_conflicts.append({
-                                    'state': state_idx,
-                                    'symbol': terminal,
-                                    'shift': existing_action,
-                                    'reduce': reduce_action
-                                })
-                                # Don't overwrite shift action
-                            elif existing_action.startswith('r'):
-                                # Reduce/Reduce conflict
-                                self.is_lr0 = False
-                                self.reduce_reduce_conflicts.append({
-                                    'state': state_idx,
-                                    'symbol': terminal,
-                                    'reduce1': existing_action,
-                                    'reduce2': reduce_action
-                                })
-                                # Keep first reduce (or could keep second)
-                        else:
-                            self.action_table[action_key] = reduce_action
-                    
-                    # Also add for end marker
-                    action_key = (state_idx, '$')
-                    if action_key in self.action_table:
-                        existing_action = self.action_table[action_key]
-                        if existing_action == 'accept':
-                            # Don't overwrite accept
-                            pass
-                        elif existing_action.startswith('r'):
-                            # Reduce/Reduce conflict
-                            self.is_lr0 = False
-                            self.reduce_reduce_conflicts.append({
-                                'state': state_idx,
-                                'symbol': '$',
-                                'reduce1': existing_action,
-                                'reduce2': reduce_action
-                            })
-                            self.action_table[action_key] = reduce_action
-                        else:
-                            self.action_table[action_key] = reduce_action
+                for symbol in sorted(row.keys() & reduce_row.keys()):
+                    existing_action = row[symbol]
+                    self.is_lr0 = False
+                    if existing_action.startswith('s'):
+                        # Shift/Reduce conflict - don't overwrite shift action
+                        self.shift_reduce_conflicts.append({
+                            'state': state_idx,
+                            'symbol': symbol,
+                            'shift': existing_action,
+                            'reduce': reduce_action
+                        })
                     else:
-                        self.action_table[action_key] = reduce_action
+                        # Reduce/Reduce conflict - keep first reduce, except
+                        # on the end marker where the later one wins
+                        self.reduce_reduce_conflicts.append({
+                            'state': state_idx,
+                            'symbol': symbol,
+                            'reduce1': existing_action,
+                            'reduce2': reduce_action
+                        })
+                        if symbol == '$':
+                            row[symbol] = reduce_action
+                
+                merged_row = dict(reduce_row)
+                merged_row.update(row)
+                row = merged_row
+            
+            if summary['accept']:
+                # Accept action
+                if '$' in row:
+                    # Conflict
+                    self.is_lr0 = False
+                row['$'] = 'accept'
+            
+            if row:
+                self.action_table[state_idx] = row
             
             # Build GOTO table for non-terminals
-            for non_terminal in self.non_terminals:
-                if (state_idx, non_terminal) in self.goto_map:
-                    next_state = self.goto_map[(state_idx, non_terminal)]
-                    self.goto_table[(state_idx, non_terminal)] = next_state
+            if summary['gotos']:
+                self.goto_table[state_idx] = dict(summary['gotos'])
+    
+    def parser_tables(self) -> Tuple[Dict[int, Dict[str, str]], Dict[int, Dict[str, int]],
+                                     List[Production], List[str], str]:
+        """
+        Get the arguments for LR0Parser, without copying the tables.
+        
+        Must be called after build_parsing_tables().
+        
+        Returns:
+            (action_table, goto_table, productions, terminals, start_symbol)
+            where terminals excludes the end marker '$'
+        """
+        return (
+            self.action_table,
+            self.goto_table,
+            self.productions,
+            sorted(self.terminals),
+            self.augmented_start
+        )
+    
+    def _format_states(self) -> List[Dict[str, Any]]:
+        """Format states for display: each state's items, sorted."""
+        sort_key = attrgetter('_sort_key')
+        return [
+            {'id': idx, 'items': [item._str for item in sorted(state, key=sort_key)]}
+            for idx, state in enumerate(self.states)
+        ]
     
-    def generate(self) -> Dict[str, Any]:
-        """Generate complete LR(0) parsing tables and return results."""
+    def generate(self, fail_fast: bool = False, include_display: bool = True) -> Dict[str, Any]:
+        """
+        Generate complete LR(0) parsing tables and return results.
+        
+        Args:
+            fail_fast: Stop building tables early for grammars with conflicts
+                       (see build_parsing_tables)
+            include_display: Format the items of every state; when False,
+                             'states' is an empty list
+        """
         self.build_dfa()
-        self.build_parsing_tables()
+        self.build_parsing_tables(fail_fast=fail_fast)
         
         # Format states for display
-        formatted_states = []
-        for idx, state in enumerate(self.states):
-            items_list = [str(item) for item in sorted(state, key=lambda x: (x.production.left, x.dot_position))]
-            formatted_states.append({
-                'id': idx,
-                'items': items_list
-            })
+        formatted_states = self._format_states() if include_display else []
         
         # Format productions
         formatted_productions = [str(prod) for prod in self.productions]
         
-        # Format ACTION table
-        action_table_formatted = {}
-        for (state, symbol), action in self.action_table.items():
-            if state not in action_table_formatted:
-                action_table_formatted[state] = {}
-            action_table_formatted[state][symbol] = action
-        
-        # Format GOTO table
-        goto_table_formatted = {}
-        for (state, non_terminal), next_state in self.goto_table.items():
-            if state not in goto_table_formatted:
-                goto_table_formatted[state] = {}
-            goto_table_formatted[state][non_terminal] = next_state
+        # ACTION and GOTO tables are already nested by state
+        action_table_formatted = dict(self.action_table)
+        goto_table_formatted = dict(self.goto_table)
         
         # Format DFA transitions
-        dfa_transitions = []
-        for (state, symbol), next_state in self.goto_map.items():
-            dfa_transitions.append({
-                'from': state,
-                'to': next_state,
-                'symbol': symbol
-            })
+        dfa_transitions = [
+            {'from': state, 'to': next_state, 'symbol': symbol}
+            for (state, symbol), next_state in self.goto_map.items()
+        ]
         
         return {
             'augmented_grammar': formatted_productions,
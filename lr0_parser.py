@@ -4,15 +4,37 @@ Uses ACTION and GOTO tables to parse input strings.
 """
 
 from typing import List, Dict, Optional, Any, Tuple
+from array import array
 from parse_tree import ParseTreeBuilder, ParseTreeNode
 from tokenizer import Tokenizer
 
 
+# Compiled ACTION opcodes
+OP_ERROR = -1
+OP_SHIFT = 0
+OP_REDUCE = 1
+OP_ACCEPT = 2
+OP_UNKNOWN = 3
+
+# Compiled ACTION cell for (state, terminal) pairs with no action
+NO_ACTION: Tuple[int, int, Optional[str]] = (OP_ERROR, 0, None)
+
+# _run_lr outcomes
+STATUS_ACCEPTED = 0
+STATUS_NO_ACTION = 1
+STATUS_INVALID_PRODUCTION = 2
+STATUS_STACK_UNDERFLOW = 3
+STATUS_NO_GOTO = 4
+STATUS_UNKNOWN_ACTION = 5
+STATUS_END_OF_INPUT = 6
+STATUS_MAX_STEPS = 7
+
+
 class LR0Parser:
     """LR(0) Parser that uses ACTION and GOTO tables to parse input."""
     
-    def __init__(self, action_table: Dict[Tuple[int, str], str],
-                 goto_table: Dict[Tuple[int, str], int],
+    def __init__(self, action_table: Dict[int, Dict[str, str]],
+                 goto_table: Dict[int, Dict[str, int]],
                  productions: List[Any],
                  terminals: List[str],
                  start_symbol: str = "S'"):
@@ -20,8 +42,8 @@ class LR0Parser:
         Initialize LR(0) parser.
         
         Args:
-            action_table: ACTION table {(state, terminal): action}
-            goto_table: GOTO table {(state, non_terminal): next_state}
+            action_table: ACTION table {state: {terminal: action}}
+            goto_table: GOTO table {state: {non_terminal: next_state}}
             productions: List of Production objects
             terminals: List of terminal symbols
             start_symbol: Augmented start symbol (default: "S'")
@@ -33,19 +55,100 @@ class LR0Parser:
         self.start_symbol = start_symbol
         self.tokenizer = Tokenizer(terminals)
         
-        # Parse state
-        self.stack: List[Any] = []  # Alternates: state, symbol, state, symbol, ...
+        # Per-production data for the reduce path, indexed by production number
+        self._prod_rhs_len: List[int] = [len(p.right) if p.right else 0 for p in productions]
+        self._prod_left: List[str] = [p.left for p in productions]
+        self._prod_str: List[str] = [str(p) for p in productions]
+        
+        self._compile_tables()
+        
+        # Parse state: state_stack[i + 1] is the state entered after symbol_stack[i]
+        self.state_stack: List[int] = []
+        self.symbol_stack: List[str] = []
         self.input_tokens: List[str] = []
+        self._input_ids: array = array('i')  # input_tokens as terminal ids
+        self._trace: array = array('i')  # _run_lr trace of the last parse
         self.current_token_index: int = 0
-        self.steps: List[Dict[str, Any]] = []
+        # Steps of the last parse as dicts, built from _trace by the steps
+        # property (None until then). These buffers are cleared and refilled
+        # by every parse.
+        self._steps: Optional[List[Dict[str, Any]]] = []
+        self._steps_detail: bool = False
+        self._last_step_failed: bool = False
+        self._step_error: Optional[str] = None
         self.tree_builder = ParseTreeBuilder(productions)
     
-    def parse(self, input_string: str) -> Dict[str, Any]:
+    def _compile_tables(self):
+        """
+        Decode the ACTION and GOTO tables into lists indexed by integer ids.
+        
+        Terminals (with '$') and non-terminals get dense ids. _action[state]
+        is a row of (opcode, argument, action) cells indexed by terminal id,
+        and _goto_flat[state * _num_nt + non-terminal id] the next state
+        (-1 if undefined).
+        """
+        # The tokenizer's ids, so parse() can run on the ids it writes; terminals
+        # only named in the ACTION table are numbered after them
+        self._term_id: Dict[str, int] = dict(self.tokenizer.terminal_ids)
+        self._nt_id: Dict[str, int] = {}
+        for left in self._prod_left:
+            self._nt_id.setdefault(left, len(self._nt_id))
+        
+        # Decode ACTION entries once and size the tables to every state seen
+        num_states = 1
+        decoded = []
+        for state, row in self.action_table.items():
+            num_states = max(num_states, state + 1)
+            for terminal, action in row.items():
+                if action == 'accept':
+                    compiled = (OP_ACCEPT, 0, action)
+                elif action[:1] == 's':
+                    compiled = (OP_SHIFT, int(action[1:]), action)
+                    num_states = max(num_states, compiled[1] + 1)
+                elif action[:1] == 'r':
+                    compiled = (OP_REDUCE, int(action[1:]), action)
+                else:
+                    compiled = (OP_UNKNOWN, 0, action)
+                decoded.append((state, self._term_id.setdefault(terminal, len(self._term_id)), compiled))
+        for state, row in self.goto_table.items():
+            num_states = max(num_states, state + 1, *(next_state + 1 for next_state in row.values()))
+            for non_terminal in row:
+                self._nt_id.setdefault(non_terminal, len(self._nt_id))
+        
+        self._action: List[List[Tuple[int, int, Optional[str]]]] = [
+            [NO_ACTION] * len(self._term_id) for _ in range(num_states)
+        ]
+        for state, term_id, compiled in decoded:
+            self._action[state][term_id] = compiled
+        
+        self._num_nt: int = len(self._nt_id)
+        self._goto_flat: array = array('i', [-1]) * (num_states * self._num_nt)
+        for state, row in self.goto_table.items():
+            for non_terminal, next_state in row.items():
+                self._goto_flat[state * self._num_nt + self._nt_id[non_terminal]] = next_state
+        
+        self._prod_left_id: List[int] = [self._nt_id[left] for left in self._prod_left]
+        self._term_sym: List[str] = list(self._term_id)  # terminal id -> terminal
+    
+    @staticmethod
+    def _interleaved_stack(state_stack: List[int], symbol_stack: List[str]) -> List[Any]:
+        """Get the stack as displayed: state, symbol, state, symbol, ..., state."""
+        stack = [None] * (2 * len(symbol_stack) + 1)
+        stack[0::2] = state_stack
+        stack[1::2] = symbol_stack
+        return stack
+    
+    def parse(self, input_string: str, record_steps: bool = False,
+              build_tree: bool = True) -> Dict[str, Any]:
         """
         Parse input string using ACTION and GOTO tables.
         
         Args:
             input_string: Input string to parse
+            record_steps: Record every parsing step (stack, remaining input,
+                          action) for display. When False only the failing
+                          step, if any, is recorded.
+            build_tree: Build the parse tree of accepted input
             
         Returns:
             Dictionary with parse results:
@@ -56,15 +159,23 @@ class LR0Parser:
                 'steps': list of parsing steps
             }
         """
-        # Reset state
-        self.stack = [0]  # Start with state 0
+        # Reset state, reusing the buffers of the previous parse
+        self.state_stack.clear()
+        self.state_stack.append(0)  # Start with state 0
+        self.symbol_stack.clear()
         self.current_token_index = 0
-        self.steps = []
+        self._steps = None
+        self._steps_detail = False
+        self._last_step_failed = False
         self.tree_builder.reset()
         
-        # Tokenize input
+        # Tokenize input into tokens and terminal ids; input_tokens is only
+        # read back for messages and the step log
+        self.input_tokens.clear()
+        input_ids = self._input_ids
+        del input_ids[:]
         try:
-            self.input_tokens = self.tokenizer.tokenize_simple(input_string)
+            self.tokenizer.tokenize_into(input_string, self.input_tokens, input_ids)
         except ValueError as e:
             return {
                 'accepted': False,
@@ -73,178 +184,225 @@ class LR0Parser:
                 'steps': []
             }
         
-        step_count = 0
+        # Run the automaton on ids only, then replay its trace for the
+        # parse tree and the step log
         max_steps = 1000  # Prevent infinite loops
+        trace = self._trace
+        del trace[:]
+        status, detail = _run_lr(
+            self._action, self._goto_flat, self._num_nt, input_ids,
+            self._prod_rhs_len, self._prod_left_id,
+            self.state_stack, trace, max_steps
+        )
         
-        while step_count < max_steps:
-            step_count += 1
-            
-            # Get current state (top of stack)
-            current_state = self.stack[-1] if self.stack else None
-            
-            if current_state is None:
-                return {
-                    'accepted': False,
-                    'error': 'Stack is empty',
-                    'parse_tree': None,
-                    'steps': self.steps
-                }
-            
-            # Get current token
-            if self.current_token_index >= len(self.input_tokens):
-                return {
-                    'accepted': False,
-                    'error': 'Unexpected end of input',
-                    'parse_tree': None,
-                    'steps': self.steps
-                }
+        self.current_token_index = trace[1::3].count(OP_SHIFT)
+        
+        if status == STATUS_END_OF_INPUT:
+            error = 'Unexpected end of input'
+        elif status == STATUS_MAX_STEPS:
+            error = f'Parser exceeded maximum steps ({max_steps})'
+        else:
+            error = None
+        
+        self._steps_detail = record_steps
+        
+        if status == STATUS_ACCEPTED:
+            parse_tree = self._build_tree(trace) if build_tree else None
+            return {
+                'accepted': True,
+                'error': None,
+                'parse_tree': parse_tree.to_dict() if parse_tree else None,
+                'steps': self.steps
+            }
+        
+        if error is None:
+            # Rejected at the last traced step, which did not shift
+            current_state, op, arg = trace[-3:]
+            token_id = input_ids[self.current_token_index]
+            current_token = self._term_sym[token_id]
+            action = self._action[current_state][token_id][2]
             
-            current_token = self.input_tokens[self.current_token_index]
+            if status == STATUS_NO_ACTION:
+                error = f"No action defined for state {current_state} and token '{current_token}'"
+            elif status == STATUS_INVALID_PRODUCTION:
+                error = f'Invalid production index: {arg}'
+            elif status == STATUS_STACK_UNDERFLOW:
+                error = f'Stack underflow: trying to pop {self._prod_rhs_len[arg]} symbols from stack of {detail} symbols'
+            elif status == STATUS_NO_GOTO:
+                error = f'No GOTO defined for state {detail} and non-terminal {self._prod_left[arg]}'
+            else:
+                error = f'Unknown action: {action}'
             
-            # Look up action
-            action_key = (current_state, current_token)
-            action = self.action_table.get(action_key)
+            self._last_step_failed = True
+            self._step_error = error
+        
+        return {
+            'accepted': False,
+            'error': error,
+            'parse_tree': None,
+            'steps': self.steps
+        }
+    
+    @property
+    def steps(self) -> List[Dict[str, Any]]:
+        """
+        The last parse's steps as dicts, built from its trace on first access.
+        
+        With record_steps, each step has the stack, the remaining input, the
+        action and a message; otherwise only a failing step is recorded, with
+        just its action, state and token. A failing step also has 'error'.
+        """
+        if self._steps is None:
+            if self._steps_detail:
+                steps = self._materialize_steps()
+            elif self._last_step_failed:
+                state = self._trace[-3]
+                token_id = self._input_ids[self.current_token_index]
+                steps = [{
+                    'step': len(self._trace) // 3,
+                    'action': self._action[state][token_id][2] or 'ERROR',
+                    'state': state,
+                    'token': self._term_sym[token_id]
+                }]
+            else:
+                steps = []
+            if self._last_step_failed:
+                steps[-1]['error'] = self._step_error
+            self._steps = steps
+        return self._steps
+    
+    def _build_tree(self, trace: array) -> Optional[ParseTreeNode]:
+        """Build the parse tree of an accepted input from its _run_lr trace."""
+        ops = trace[1::3]
+        args = trace[2::3]
+        reduce_trace = array('i', [
+            arg if op == OP_REDUCE else -1
+            for op, arg in zip(ops, args) if op == OP_SHIFT or op == OP_REDUCE
+        ])
+        return self.tree_builder.build_from_trace(self.input_tokens[:self.current_token_index], reduce_trace)
+    
+    def _materialize_steps(self) -> List[Dict[str, Any]]:
+        """
+        Replay the _run_lr trace to build the full step log, in one pass.
+        Only steps that were fully applied change the (local) stacks.
+        """
+        state_stack = [0]
+        symbol_stack = []
+        token_index = 0
+        steps = []
+        trace = self._trace
+        input_ids = self._input_ids
+        last_step_no = len(trace) // 3
+        
+        for step_no, current_state, op, arg in zip(range(1, last_step_no + 1),
+                                                    trace[0::3], trace[1::3], trace[2::3]):
+            token_id = input_ids[token_index]
+            current_token = self._term_sym[token_id]
             
             # Record step
+            action = self._action[current_state][token_id][2]
             step = {
-                'step': step_count,
-                'stack': self.stack.copy(),
-                'input': self.input_tokens[self.current_token_index:],
+                'step': step_no,
+                'stack': self._interleaved_stack(state_stack, symbol_stack),
+                'input': self.input_tokens[token_index:],
                 'action': action or 'ERROR',
                 'state': current_state,
                 'token': current_token
             }
+            steps.append(step)
             
-            if action is None:
-                # Error - no action defined
-                step['error'] = f"No action defined for state {current_state} and token '{current_token}'"
-                self.steps.append(step)
-                return {
-                    'accepted': False,
-                    'error': step['error'],
-                    'parse_tree': None,
-                    'steps': self.steps
-                }
+            if step_no == last_step_no and self._last_step_failed:
+                # The failing step - it did not change the stacks
+                break
             
-            # Handle action
-            if action == 'accept':
-                # Success!
+            if op == OP_ACCEPT:
                 step['message'] = 'Input accepted!'
-                self.steps.append(step)
-                parse_tree = self.tree_builder.get_tree()
-                return {
-                    'accepted': True,
-                    'error': None,
-                    'parse_tree': parse_tree.to_dict() if parse_tree else None,
-                    'steps': self.steps
-                }
             
-            elif action.startswith('s'):
-                # Shift action: sN means shift and go to state N
-                next_state = int(action[1:])
-                
+            elif op == OP_SHIFT:
                 # Push token and state
-                self.stack.append(current_token)
-                self.stack.append(next_state)
-                
-                # Add to parse tree
-                self.tree_builder.shift(current_token)
+                symbol_stack.append(current_token)
+                state_stack.append(arg)
                 
                 # Move to next token
-                self.current_token_index += 1
+                token_index += 1
                 
-                step['message'] = f'Shift {current_token}, goto state {next_state}'
-                self.steps.append(step)
+                step['message'] = f'Shift {current_token}, goto state {arg}'
             
-            elif action.startswith('r'):
-                # Reduce action: rN means reduce using production N
-                production_index = int(action[1:])
-                
-                if production_index >= len(self.productions):
-                    step['error'] = f'Invalid production index: {production_index}'
-                    self.steps.append(step)
-                    return {
-                        'accepted': False,
-                        'error': step['error'],
-                        'parse_tree': None,
-                        'steps': self.steps
-                    }
-                
-                production = self.productions[production_index]
-                # For epsilon productions, num_symbols is 0
-                num_symbols = len(production.right) * 2 if production.right else 0  # Each symbol has state and symbol
-                
-                # Pop symbols from stack
-                if len(self.stack) < num_symbols:
-                    step['error'] = f'Stack underflow: trying to pop {num_symbols} items from stack of size {len(self.stack)}'
-                    self.steps.append(step)
-                    return {
-                        'accepted': False,
-                        'error': step['error'],
-                        'parse_tree': None,
-                        'steps': self.steps
-                    }
+            elif op == OP_REDUCE:
+                num_rhs_symbols = self._prod_rhs_len[arg]
                 
                 # Pop symbols (and their states)
-                popped_symbols = []
-                for _ in range(num_symbols):
-                    popped_symbols.insert(0, self.stack.pop())
-                
-                # Get state after popping
-                if not self.stack:
-                    step['error'] = 'Stack empty after popping'
-                    self.steps.append(step)
-                    return {
-                        'accepted': False,
-                        'error': step['error'],
-                        'parse_tree': None,
-                        'steps': self.steps
-                    }
-                
-                state_after_pop = self.stack[-1]
-                
-                # Look up GOTO
-                goto_key = (state_after_pop, production.left)
-                next_state = self.goto_table.get(goto_key)
-                
-                if next_state is None:
-                    step['error'] = f'No GOTO defined for state {state_after_pop} and non-terminal {production.left}'
-                    self.steps.append(step)
-                    return {
-                        'accepted': False,
-                        'error': step['error'],
-                        'parse_tree': None,
-                        'steps': self.steps
-                    }
+                if num_rhs_symbols:
+                    del symbol_stack[-num_rhs_symbols:]
+                    del state_stack[-num_rhs_symbols:]
                 
                 # Push non-terminal and new state
-                self.stack.append(production.left)
-                self.stack.append(next_state)
+                next_state = self._goto_flat[state_stack[-1] * self._num_nt + self._prod_left_id[arg]]
+                symbol_stack.append(self._prod_left[arg])
+                state_stack.append(next_state)
                 
-                # Update parse tree
-                num_rhs_symbols = len(production.right) if production.right else 0
-                self.tree_builder.reduce(production_index, num_rhs_symbols)
-                
-                step['message'] = f'Reduce {production}, goto state {next_state}'
-                step['production'] = str(production)
-                self.steps.append(step)
-            
-            else:
-                # Unknown action
-                step['error'] = f'Unknown action: {action}'
-                self.steps.append(step)
-                return {
-                    'accepted': False,
-                    'error': step['error'],
-                    'parse_tree': None,
-                    'steps': self.steps
-                }
-        
-        # Too many steps
-        return {
-            'accepted': False,
-            'error': f'Parser exceeded maximum steps ({max_steps})',
-            'parse_tree': None,
-            'steps': self.steps
-        }
+                production_str = self._prod_str[arg]
+                step['message'] = f'Reduce {production_str}, goto state {next_state}'
+                step['production'] = production_str
+        
+        return steps
 
+
+def _run_lr(action_rows: List[List[Tuple[int, int, Optional[str]]]], goto_flat: array,
+            num_non_terminals: int, input_ids: array, rhs_len: List[int], left_id: List[int],
+            state_stack: List[int], trace: array, max_steps: int) -> Tuple[int, int]:
+    """
+    LR driver loop over integer tables.
+    
+    Runs the automaton from state_stack on input_ids (terminal ids ending
+    with the id of '$'), appending (state, opcode, argument) for every step
+    to trace. Only ints are handled here; symbols, steps and the parse tree
+    are rebuilt from the trace by the caller.
+    
+    Returns:
+        (status, detail): one of the STATUS_* codes, and for
+        STATUS_STACK_UNDERFLOW the number of symbols on the stack or for
+        STATUS_NO_GOTO the state after popping (0 otherwise)
+    """
+    num_productions = len(rhs_len)
+    token_index = 0
+    
+    for _ in range(max_steps):
+        if token_index >= len(input_ids):
+            return STATUS_END_OF_INPUT, 0
+        
+        current_state = state_stack[-1]
+        op, arg, _action = action_rows[current_state][input_ids[token_index]]
+        trace.append(current_state)
+        trace.append(op)
+        trace.append(arg)
+        
+        if op == OP_SHIFT:
+            state_stack.append(arg)
+            token_index += 1
+        
+        elif op == OP_REDUCE:
+            if arg >= num_productions:
+                return STATUS_INVALID_PRODUCTION, 0
+            
+            num_rhs_symbols = rhs_len[arg]
+            if num_rhs_symbols > len(state_stack) - 1:
+                return STATUS_STACK_UNDERFLOW, len(state_stack) - 1
+            if num_rhs_symbols:
+                del state_stack[-num_rhs_symbols:]
+            
+            next_state = goto_flat[state_stack[-1] * num_non_terminals + left_id[arg]]
+            if next_state < 0:
+                return STATUS_NO_GOTO, state_stack[-1]
+            state_stack.append(next_state)
+        
+        elif op == OP_ACCEPT:
+            return STATUS_ACCEPTED, 0
+        
+        elif op == OP_ERROR:
+            return STATUS_NO_ACTION, 0
+        
+        else:
+            return STATUS_UNKNOWN_ACTION, 0
+    
+    return STATUS_MAX_STEPS, 0
@@ -3,24 +3,45 @@ Parse tree construction for LR(0) parser.
 Builds a parse tree showing how input was parsed.
 """
 
-from typing import List, Optional, Any, Dict
-from dataclasses import dataclass, field
+from typing import List, Optional, Any, Dict, Sequence
 
 
-@dataclass
 class ParseTreeNode:
     """Represents a node in the parse tree."""
-    symbol: str  # Terminal or non-terminal
-    children: List['ParseTreeNode'] = field(default_factory=list)
-    production: Optional[str] = None  # Production used (for non-terminals)
+    
+    __slots__ = ('symbol', 'children', 'production')
+    
+    def __init__(self, symbol: str, children: Optional[List['ParseTreeNode']] = None,
+                 production: Optional[str] = None):
+        self.symbol = symbol  # Terminal or non-terminal
+        self.children = children if children is not None else []
+        self.production = production  # Production used (for non-terminals)
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert node to dictionary for JSON serialization."""
-        return {
-            'symbol': self.symbol,
-            'production': self.production,
-            'children': [child.to_dict() for child in self.children]
-        }
+        # Iterative, so deep trees don't hit the recursion limit: each node's
+        # dict is created when it is popped and stored into its parent's slot
+        root = None
+        work = [(self, None, 0)]  # (node, parent's children list, slot)
+        
+        while work:
+            node, parent, slot = work.pop()
+            children = node.children
+            node_dict = {
+                'symbol': node.symbol,
+                'production': node.production,
+                'children': [None] * len(children)
+            }
+            if parent is None:
+                root = node_dict
+            else:
+                parent[slot] = node_dict
+            
+            child_slots = node_dict['children']
+            for i, child in enumerate(children):
+                work.append((child, child_slots, i))
+        
+        return root
     
     def __repr__(self):
         if self.children:
@@ -39,6 +60,7 @@ class ParseTreeBuilder:
             productions: List of Production objects
         """
         self.productions = productions
+        self._prod_strs: List[str] = [str(p) for p in productions]
         self.tree_stack: List[ParseTreeNode] = []
     
     def reduce(self, production_index: int, num_symbols: int):
@@ -56,16 +78,18 @@ class ParseTreeBuilder:
         left_hand_side = production.left
         
         # Pop children from tree stack
-        children = []
-        for _ in range(num_symbols):
-            if self.tree_stack:
-                children.insert(0, self.tree_stack.pop())
+        num_symbols = min(num_symbols, len(self.tree_stack))
+        if num_symbols:
+            children = self.tree_stack[-num_symbols:]
+            del self.tree_stack[-num_symbols:]
+        else:
+            children = []
         
         # Create new node
         node = ParseTreeNode(
             symbol=left_hand_side,
             children=children,
-            production=str(production)
+            production=self._prod_strs[production_index]
         )
         
         # Push new node
@@ -81,6 +105,49 @@ class ParseTreeBuilder:
         node = ParseTreeNode(symbol=symbol)
         self.tree_stack.append(node)
     
+    def build_from_trace(self, shift_trace: Sequence[str],
+                         reduce_trace: Sequence[int]) -> Optional[ParseTreeNode]:
+        """
+        Build the parse tree in one pass from a finished parse.
+        
+        Args:
+            shift_trace: Shifted terminals, in order
+            reduce_trace: The parser's moves, in order: -1 for a shift
+                          (consuming the next entry of shift_trace) or the
+                          index of the production reduced by
+            
+        Returns:
+            Root node of parse tree, or None if tree is incomplete
+        """
+        productions = self.productions
+        num_productions = len(productions)
+        tree_stack = self.tree_stack = []
+        shifted = iter(shift_trace)
+        
+        for production_index in reduce_trace:
+            if production_index < 0:
+                tree_stack.append(ParseTreeNode(symbol=next(shifted)))
+                continue
+            
+            if production_index >= num_productions:
+                continue
+            
+            production = productions[production_index]
+            num_symbols = len(production.right)
+            if num_symbols:
+                children = tree_stack[-num_symbols:]
+                del tree_stack[-num_symbols:]
+            else:
+                children = []
+            
+            tree_stack.append(ParseTreeNode(
+                symbol=production.left,
+                children=children,
+                production=self._prod_strs[production_index]
+            ))
+        
+        return self.get_tree()
+    
     def get_tree(self) -> Optional[ParseTreeNode]:
         """
         Get the final parse tree.
@@ -9,6 +9,11 @@ from collections import defaultdict
 from lr0_algorithm import LR0ParserGenerator, Production, LR0Item
 
 
+# Symbols that get a FIRST/FOLLOW bit besides the terminals
+_END = '$'
+_EPS = 'ε'
+
+
 class SLR1ParserGenerator(LR0ParserGenerator):
     """SLR(1) Parser Table Generator - extends LR(0) with FOLLOW sets."""
     
@@ -22,123 +27,134 @@ class SLR1ParserGenerator(LR0ParserGenerator):
         super().__init__(grammar)
         self.first_sets: Dict[str, Set[str]] = {}
         self.follow_sets: Dict[str, Set[str]] = {}
+        # The same sets as bitmasks over self._bit, used while computing them
+        self.first_sets_bits: Dict[str, int] = {}
+        self.follow_sets_bits: Dict[str, int] = {}
+        self._assign_bits()
         self.is_slr1: bool = True
         
+    def _assign_bits(self):
+        """
+        Give every terminal, '$' and 'ε' a bit, so FIRST and FOLLOW sets can
+        be computed as int bitmasks.
+        """
+        self._bit_sym: List[str] = sorted(self.terminals)
+        for extra in (_END, _EPS):
+            if extra not in self.terminals:
+                self._bit_sym.append(extra)
+        self._bit: Dict[str, int] = {sym: idx for idx, sym in enumerate(self._bit_sym)}
+        self._eps_bit: int = 1 << self._bit[_EPS]
+    
+    def _bits_to_set(self, mask: int) -> Set[str]:
+        """Decode a FIRST/FOLLOW bitmask into a set of symbols."""
+        bit_sym = self._bit_sym
+        result = set()
+        while mask:
+            low_bit = mask & -mask
+            result.add(bit_sym[low_bit.bit_length() - 1])
+            mask ^= low_bit
+        return result
+    
     def compute_first_sets(self):
         """Compute FIRST sets for all symbols."""
-        # Initialize FIRST sets
-        for symbol in self.non_terminals | self.terminals:
-            self.first_sets[symbol] = set()
-        
-        # FIRST(terminal) = {terminal}
+        # FIRST(terminal) = {terminal}, FIRST(non-terminal) starts empty
+        first_bits = self.first_sets_bits = {symbol: 0 for symbol in self.non_terminals}
         for terminal in self.terminals:
-            self.first_sets[terminal].add(terminal)
+            first_bits[terminal] = 1 << self._bit[terminal]
         
-        # Iterate until no changes
-        changed = True
-        while changed:
-            changed = False
+        # Productions whose right-hand side mentions each non-terminal: only
+        # those can gain anything when that non-terminal's FIRST set grows
+        uses: Dict[str, List[int]] = defaultdict(list)
+        for prod_idx, production in enumerate(self.productions):
+            for symbol in set(production.right):
+                if symbol in self.non_terminals:
+                    uses[symbol].append(prod_idx)
+        
+        # Revisit productions until none is dirty
+        dirty = set(range(len(self.productions)))
+        while dirty:
+            next_dirty = set()
             
-            for production in self.productions:
+            for prod_idx in sorted(dirty):
+                production = self.productions[prod_idx]
                 left = production.left
-                right = production.right
                 
-                if not right:
-                    # Epsilon production: FIRST(A) includes ε
-                    if 'ε' not in self.first_sets[left]:
-                        self.first_sets[left].add('ε')
-                        changed = True
-                else:
-                    # FIRST(A) includes FIRST(α) where A → α
-                    all_have_epsilon = True
-                    for symbol in right:
-                        # Add FIRST(symbol) - {ε} to FIRST(left)
-                        first_symbol = self.first_sets.get(symbol, set())
-                        to_add = first_symbol - {'ε'}
-                        if to_add - self.first_sets[left]:
-                            self.first_sets[left].update(to_add)
-                            changed = True
-                        
-                        if 'ε' not in first_symbol:
-                            all_have_epsilon = False
-                            break
-                    
-                    # If all symbols have ε, add ε to FIRST(left)
-                    if all_have_epsilon and 'ε' not in self.first_sets[left]:
-                        self.first_sets[left].add('ε')
-                        changed = True
+                # FIRST(A) includes FIRST(α) where A → α, plus ε if every
+                # symbol of α (or α itself, for A → ε) can derive ε
+                new_bits = first_bits[left] | self._first_of_string_bits(production.right)
+                if new_bits != first_bits[left]:
+                    first_bits[left] = new_bits
+                    next_dirty.update(uses[left])
+            
+            dirty = next_dirty
+        
+        self.first_sets = {symbol: self._bits_to_set(bits) for symbol, bits in first_bits.items()}
     
     def compute_follow_sets(self):
         """Compute FOLLOW sets for all non-terminals."""
-        # Initialize FOLLOW sets
-        for non_terminal in self.non_terminals:
-            self.follow_sets[non_terminal] = set()
+        eps_bit = self._eps_bit
         
         # FOLLOW(S') contains $
-        self.follow_sets[self.augmented_start].add('$')
+        follow_bits = self.follow_sets_bits = {non_terminal: 0 for non_terminal in self.non_terminals}
+        follow_bits[self.augmented_start] = 1 << self._bit[_END]
+        
+        # For each production A → αBβ, FOLLOW(B) includes FIRST(β) - {ε},
+        # and FOLLOW(A) if ε is in FIRST(β) (or β is empty). FIRST sets are
+        # final by now, so collect (A, B, FIRST(β) - {ε}, ε in FIRST(β)) once
+        triples: List[Tuple[str, str, int, bool]] = []
+        for production in self.productions:
+            right = production.right
+            for i, symbol in enumerate(right):
+                if symbol in self.non_terminals:
+                    first_beta = self._first_of_string_bits(right[i + 1:])
+                    triples.append((production.left, symbol, first_beta & ~eps_bit, bool(first_beta & eps_bit)))
         
         # Iterate until no changes
         changed = True
         while changed:
             changed = False
             
-            for production in self.productions:
-                left = production.left
-                right = production.right
-                
-                if not right:
-                    continue
+            for left, symbol, first_beta, beta_has_eps in triples:
+                new_bits = follow_bits[symbol] | first_beta
+                if beta_has_eps:
+                    new_bits |= follow_bits[left]
                 
-                # For each production A → αBβ
-                for i, symbol in enumerate(right):
-                    if symbol not in self.non_terminals:
-                        continue
-                    
-                    # FOLLOW(B) includes FIRST(β) - {ε}
-                    beta = right[i + 1:]
-                    if beta:
-                        first_beta = self.first_of_string(beta)
-                        to_add = first_beta - {'ε'}
-                        if to_add - self.follow_sets[symbol]:
-                            self.follow_sets[symbol].update(to_add)
-                            changed = True
-                        
-                        # If ε in FIRST(β), FOLLOW(B) includes FOLLOW(A)
-                        if 'ε' in first_beta:
-                            if self.follow_sets[left] - self.follow_sets[symbol]:
-                                self.follow_sets[symbol].update(self.follow_sets[left])
-                                changed = True
-                    else:
-                        # β is empty, FOLLOW(B) includes FOLLOW(A)
-                        if self.follow_sets[left] - self.follow_sets[symbol]:
-                            self.follow_sets[symbol].update(self.follow_sets[left])
-                            changed = True
-    
-    def first_of_string(self, symbols: List[str]) -> Set[str]:
-        """Compute FIRST set for a string of symbols."""
-        if not symbols:
-            return {'ε'}
+                if new_bits != follow_bits[symbol]:
+                    follow_bits[symbol] = new_bits
+                    changed = True
         
-        first_set = set()
-        all_have_epsilon = True
+        self.follow_sets = {non_terminal: self._bits_to_set(bits) for non_terminal, bits in follow_bits.items()}
+    
+    def _first_of_string_bits(self, symbols: List[str]) -> int:
+        """FIRST set of a string of symbols, as a bitmask (see first_of_string)."""
+        eps_bit = self._eps_bit
+        first_bits = self.first_sets_bits
+        result = 0
         
         for symbol in symbols:
-            symbol_first = self.first_sets.get(symbol, set())
-            first_set.update(symbol_first - {'ε'})
+            symbol_first = first_bits.get(symbol, 0)
+            result |= symbol_first & ~eps_bit
             
-            if 'ε' not in symbol_first:
-                all_have_epsilon = False
-                break
-        
-        if all_have_epsilon:
-            first_set.add('ε')
+            if not symbol_first & eps_bit:
+                return result
         
-        return first_set
+        return result | eps_bit
+    
+    def first_of_string(self, symbols: List[str]) -> Set[str]:
+        """Compute FIRST set for a string of symbols."""
+        return self._bits_to_set(self._first_of_string_bits(symbols))
     
-    def build_parsing_tables(self):
-        """Build ACTION and GOTO parsing tables using SLR(1) method."""
-        self.action_table = {}
-        self.goto_table = {}
+    def build_parsing_tables(self, fail_fast: bool = False):
+        """
+        Build ACTION and GOTO parsing tables using SLR(1) method.
+        
+        Args:
+            fail_fast: Stop once the grammar is known not to be SLR(1) and
+                       FAIL_FAST_CONFLICT_LIMIT conflicts have been collected.
+                       The tables are left incomplete in that case.
+        """
+        self.action_table = defaultdict(dict)
+        self.goto_table = defaultdict(dict)
         self.shift_reduce_conflicts = []
         self.reduce_reduce_conflicts = []
         self.is_slr1 = True
@@ -147,146 +163,96 @@ class SLR1ParserGenerator(LR0ParserGenerator):
         self.compute_first_sets()
         self.compute_follow_sets()
         
-        # Track which productions have been processed for reduce actions per state
-        processed_reduces = {}  # state_idx -> set of production indices
+        # FOLLOW(A) as a list in bit order, per left-hand side
+        follow_lists: Dict[str, List[str]] = {}
         
-        for state_idx, state in enumerate(self.states):
-            processed_reduces[state_idx] = set()
+        for state_idx, summary in enumerate(self._state_summary):
+            if fail_fast and not self.is_slr1 and self._has_enough_conflicts():
+                break
             
-            for item in state:
-                next_sym = item.next_symbol()
-                
-                if item.is_accept_item():
-                    # Accept action
-                    if (state_idx, '$') in self.action_table:
-                        self.is_slr1 = False
-                    self.action_table[(state_idx, '$')] = 'accept'
+            # Shift actions
+            row: Dict[str, str] = {
+                terminal: f"s{next_state}" for terminal, next_state in summary['shifts'].items()
+            }
+            
+            for prod_idx in summary['reduces']:
+                # Reduce action - SLR(1) key difference: only on FOLLOW set
+                reduce_action = self._reduce_action[prod_idx]
+                left = self.productions[prod_idx].left
                 
-                elif next_sym and next_sym in self.terminals:
-                    # Shift action
-                    next_state = self.goto_map.get((state_idx, next_sym))
-                    if next_state is not None:
-                        action_key = (state_idx, next_sym)
-                        if action_key in self.action_table:
-                            existing_action = self.action_table[action_key]
-                            if existing_action.startswith('r') and existing_action != 'accept':
-                                # Shift/Reduce conflict
-                                self.is_slr1 = False
-                                self.shift_reduce_conflicts.append({
-                                    'state': state_idx,
-                                    'symbol': next_sym,
-                                    'shift': f"s{next_state}",
-                                    'reduce': existing_action
-                                })
-                                # Keep shift (default resolution)
-                                self.action_table[action_key] = f"s{next_state}"
-                        else:
-                            self.action_table[action_key] = f"s{next_state}"
+                # Get FOLLOW set of left-hand side
+                follow_list = follow_lists.get(left)
+                if follow_list is None:
+                    follow_bits = self.follow_sets_bits.get(left, 0)
+                    follow_list = [sym for bit, sym in enumerate(self._bit_sym) if follow_bits >> bit & 1]
+                    follow_lists[left] = follow_list
                 
-                elif item.is_reduce_item() and not item.is_accept_item():
-                    # Reduce action - SLR(1) key difference: only on FOLLOW set
-                    prod_idx = self.productions.index(item.production)
-                    
-                    # Only process each production once per state
-                    if prod_idx in processed_reduces[state_idx]:
-                        continue
-                    processed_reduces[state_idx].add(prod_idx)
-                    
-                    reduce_action = f"r{prod_idx}"
-                    
-                    # Get FOLLOW set of left-hand side
-                    follow_set = self.follow_sets.get(item.production.left, set())
-                    
-                    # Add reduce action only for terminals in FOLLOW set
-                    for terminal in follow_set:
-                        action_key = (state_idx, terminal)
-                        if action_key in self.action_table:
-                            existing_action = self.action_table[action_key]
-                            if existing_action.startswith('s'):
-                                # Shift/Reduce conflict
-                                self.is_slr1 = False
-                                self.shift_reduce_conflicts.append({
-                                    'state': state_idx,
-                                    'symbol': terminal,
-                                    'shift': existing_action,
-                                    'reduce': reduce_action
-                                })
-                            elif existing_action.startswith('r') and existing_action != reduce_action:
-                                # Reduce/Reduce conflict (only if different productions)
-                                self.is_slr1 = False
-                                self.reduce_reduce_conflicts.append({
-                                    'state': state_idx,
-                                    'symbol': terminal,
-                                    'reduce1': existing_action,
-                                    'reduce2': reduce_action
-                                })
-                        else:
-                            self.action_table[action_key] = reduce_action
-                    
-                    # Also handle $ if in FOLLOW set
-                    if '$' in follow_set:
-                        action_key = (state_idx, '$')
-                        if action_key in self.action_table:
-                            existing_action = self.action_table[action_key]
-                            if existing_action == 'accept':
-                                pass  # Don't overwrite accept
-                            elif existing_action.startswith('r') and existing_action != reduce_action:
-                                # Reduce/Reduce conflict (only if different productions)
-                                self.is_slr1 = False
-                                self.reduce_reduce_conflicts.append({
-                                    'state': state_idx,
-                                    'symbol': '$',
-                                    'reduce1': existing_action,
-                                    'reduce2': reduce_action
-                                })
+                # Add reduce action only for terminals (and $) in FOLLOW set
+                for terminal in follow_list:
+                    if terminal in row:
+                        existing_action = row[terminal]
+                        if existing_action.startswith('s'):
+                            # Shift/Reduce conflict - keep shift (default resolution)
+                            self.is_slr1 = False
+                            self.shift_reduce_conflicts.append({
+                                'state': state_idx,
+                                'symbol': terminal,
+                                'shift': existing_action,
+                                'reduce': reduce_action
+                            })
                         else:
-                            self.action_table[action_key] = reduce_action
+                            # Reduce/Reduce conflict - keep the first reduce
+                            self.is_slr1 = False
+                            self.reduce_reduce_conflicts.append({
+                                'state': state_idx,
+                                'symbol': terminal,
+                                'reduce1': existing_action,
+                                'reduce2': reduce_action
+                            })
+                    else:
+                        row[terminal] = reduce_action
+            
+            if summary['accept']:
+                # Accept action
+                if _END in row:
+                    self.is_slr1 = False
+                row[_END] = 'accept'
+            
+            if row:
+                self.action_table[state_idx] = row
             
             # Build GOTO table for non-terminals
-            for non_terminal in self.non_terminals:
-                if (state_idx, non_terminal) in self.goto_map:
-                    next_state = self.goto_map[(state_idx, non_terminal)]
-                    self.goto_table[(state_idx, non_terminal)] = next_state
+            if summary['gotos']:
+                self.goto_table[state_idx] = dict(summary['gotos'])
     
-    def generate(self) -> Dict[str, Any]:
-        """Generate complete SLR(1) parsing tables and return results."""
+    def generate(self, fail_fast: bool = False, include_display: bool = True) -> Dict[str, Any]:
+        """
+        Generate complete SLR(1) parsing tables and return results.
+        
+        Args:
+            fail_fast: Stop building tables early for grammars with conflicts
+                       (see build_parsing_tables)
+            include_display: Format the items of every state; when False,
+                             'states' is an empty list
+        """
         self.build_dfa()
-        self.build_parsing_tables()
+        self.build_parsing_tables(fail_fast=fail_fast)
         
         # Format states for display
-        formatted_states = []
-        for idx, state in enumerate(self.states):
-            items_list = [str(item) for item in sorted(state, key=lambda x: (x.production.left, x.dot_position))]
-            formatted_states.append({
-                'id': idx,
-                'items': items_list
-            })
+        formatted_states = self._format_states() if include_display else []
         
         # Format productions
         formatted_productions = [str(prod) for prod in self.productions]
         
-        # Format ACTION table
-        action_table_formatted = {}
-        for (state, symbol), action in self.action_table.items():
-            if state not in action_table_formatted:
-                action_table_formatted[state] = {}
-            action_table_formatted[state][symbol] = action
-        
-        # Format GOTO table
-        goto_table_formatted = {}
-        for (state, non_terminal), next_state in self.goto_table.items():
-            if state not in goto_table_formatted:
-                goto_table_formatted[state] = {}
-            goto_table_formatted[state][non_terminal] = next_state
+        # ACTION and GOTO tables are already nested by state
+        action_table_formatted = dict(self.action_table)
+        goto_table_formatted = dict(self.goto_table)
         
         # Format DFA transitions
-        dfa_transitions = []
-        for (state, symbol), next_state in self.goto_map.items():
-            dfa_transitions.append({
-                'from': state,
-                'to': next_state,
-                'symbol': symbol
-            })
+        dfa_transitions = [
+            {'from': state, 'to': next_state, 'symbol': symbol}
+            for (state, symbol), next_state in self.goto_map.items()
+        ]
         
         # Format FIRST sets
         first_sets_formatted = {}
@@ -305,7 +271,7 @@ class SLR1ParserGenerator(LR0ParserGenerator):
             'action_table': action_table_formatted,
             'goto_table': goto_table_formatted,
             'dfa_transitions': dfa_transitions,
-            'terminals': sorted(list(self.terminals)) + ['$'],
+            'terminals': sorted(list(self.terminals)) + [_END],
             'non_terminals': sorted(list(self.non_terminals)),
             'shift_reduce_conflicts': self.shift_reduce_conflicts,
             'reduce_reduce_conflicts': self.reduce_reduce_conflicts,
@@ -3,7 +3,70 @@ Simple tokenizer for LR(0) parser input strings.
 Converts input string into list of tokens.
 """
 
-from typing import List
+import re
+from array import array
+from collections import OrderedDict
+from functools import lru_cache
+from itertools import chain
+from typing import List, Dict, Tuple, Optional, Pattern, Any
+
+
+# End-of-input marker appended to every token list
+_END_TOKEN = '$'
+# Trie key marking the end of a terminal (never equal to a character)
+_TRIE_END = ''
+
+# Number of inputs whose tokenize() results each Tokenizer keeps
+TOKENIZE_CACHE_SIZE = 1024
+
+# Common operators that tokenize_simple splits on
+_OPERATORS = frozenset('+-*/()=,;:.&|!<>')
+_OPERATOR_CLASS = ''.join(sorted(re.escape(op) for op in _OPERATORS))
+# A token of tokenize_simple: an operator or a word between operators/whitespace
+_SIMPLE_TOKEN_RE = re.compile(rf'[{_OPERATOR_CLASS}]|[^\s{_OPERATOR_CLASS}]+')
+
+
+def _trie_pattern(node: Dict[str, Any]) -> str:
+    """Regex for the strings spelled by a (non-empty) trie node's subtree."""
+    branches = [
+        re.escape(char) + _trie_pattern(child)
+        for char, child in node.items() if char != _TRIE_END
+    ]
+    if node.get(_TRIE_END):
+        # Ending here is the last resort
+        branches.append('')
+    if len(branches) == 1:
+        return branches[0]
+    return '(?:' + '|'.join(branches) + ')'
+
+
+@lru_cache(maxsize=128)
+def _compile_scanner(terminals_sorted: Tuple[str, ...]) -> Pattern:
+    """
+    Build the scanner for Tokenizer.tokenize, once per terminal list.
+    
+    Args:
+        terminals_sorted: Terminals, longest first
+        
+    Returns:
+        The token pattern
+    """
+    # Prefix tree of the terminals; the node where a terminal ends maps
+    # _TRIE_END to True
+    trie: Dict[str, Any] = {}
+    for terminal in terminals_sorted:
+        node = trie
+        for char in terminal:
+            node = node.setdefault(char, {})
+        node[_TRIE_END] = True
+    
+    # Optional whitespace, then a terminal or any other non-whitespace
+    # character as group 1. The terminals are matched through the trie
+    # turned into nested groups, so each input character is tested against
+    # one node's branches only, and longer continuations are tried before a
+    # terminal ends, so the longest terminal matching at a position wins
+    alternatives = _trie_pattern(trie) if trie else '(?!)'
+    return re.compile(rf'\s*({alternatives}|\S)')
 
 
 class Tokenizer:
@@ -17,58 +80,101 @@ class Tokenizer:
             terminals: List of terminal symbols in the grammar
         """
         self.terminals = terminals
-        # Sort by length (longest first) to match multi-character terminals first
-        self.terminals_sorted = sorted(terminals, key=len, reverse=True)
+        self._terminals_set = frozenset(terminals)  # for membership tests
+        # Terminal ids written by tokenize_into: terminals in order, then '$'.
+        # LR0Parser numbers its ACTION columns the same way.
+        self.terminal_ids: Dict[str, int] = {}
+        for terminal in list(terminals) + [_END_TOKEN]:
+            self.terminal_ids.setdefault(terminal, len(self.terminal_ids))
+        # Sort by length (longest first) to match multi-character terminals
+        # first: bucket by length, keeping the given order within a length
+        buckets: List[List[str]] = [[] for _ in range(max(map(len, terminals), default=0) + 1)]
+        for terminal in terminals:
+            buckets[len(terminal)].append(terminal)
+        self.terminals_sorted = [terminal for bucket in reversed(buckets) for terminal in bucket]
+        
+        self._token_re = _compile_scanner(tuple(self.terminals_sorted))
+        # input string -> tokenize_tuple result, least recently used first
+        self._cache: 'OrderedDict[str, Tuple[str, ...]]' = OrderedDict()
     
     def tokenize(self, input_string: str) -> List[str]:
         """
         Tokenize input string into list of tokens.
         
+        At each position the longest matching terminal is taken; whitespace
+        between tokens is skipped.
+        
         Args:
             input_string: Input string to tokenize
             
         Returns:
             List of tokens (terminals) with '$' appended at the end
         """
-        if not input_string.strip():
-            return ['$']
+        return list(self.tokenize_tuple(input_string))
+    
+    def tokenize_tuple(self, input_string: str) -> Tuple[str, ...]:
+        """
+        Like tokenize, but returns a tuple, shared with later calls for the
+        same input: the last TOKENIZE_CACHE_SIZE results are memoized.
+        """
+        cache = self._cache
+        tokens = cache.get(input_string)
+        if tokens is not None:
+            cache.move_to_end(input_string)
+            return tokens
         
-        tokens = []
-        remaining = input_string.strip()
+        tokens = tuple(self._tokenize(input_string))
+        cache[input_string] = tokens
+        if len(cache) > TOKENIZE_CACHE_SIZE:
+            cache.popitem(last=False)
+        return tokens
+    
+    def _tokenize(self, input_string: str) -> List[str]:
+        """Uncached tokenize."""
+        token_re = self._token_re
+        terminals_set = self._terminals_set
         
-        while remaining:
-            matched = False
-            
-            # Try to match each terminal (longest first)
-            for terminal in self.terminals_sorted:
-                # Handle special characters that need escaping
-                if terminal.startswith(remaining[:len(terminal)]):
-                    tokens.append(terminal)
-                    remaining = remaining[len(terminal):].strip()
-                    matched = True
-                    break
-                # For simple terminals, check if they match at start
-                elif remaining.startswith(terminal):
-                    tokens.append(terminal)
-                    remaining = remaining[len(terminal):].strip()
-                    matched = True
-                    break
-            
-            if not matched:
-                # Try to match single character
-                if remaining:
-                    char = remaining[0]
-                    if char in self.terminals:
-                        tokens.append(char)
-                        remaining = remaining[1:].strip()
-                    else:
-                        # Unknown token - return error
-                        raise ValueError(f"Unknown token: '{char}' at position {len(input_string) - len(remaining)}")
+        # One C-level pass: every token, each a terminal or an unknown character
+        tokens = token_re.findall(input_string)
+        
+        if not terminals_set.issuperset(tokens):
+            # Unknown token - return error
+            for match in token_re.finditer(input_string):
+                if match.group(1) not in terminals_set:
+                    raise ValueError(f"Unknown token: '{match.group(1)}' at position {match.start(1)}")
         
         # Add end marker
-        tokens.append('$')
+        tokens.append(_END_TOKEN)
         return tokens
     
+    def tokenize_batch(self, inputs: List[str]) -> List[List[str]]:
+        """
+        Tokenize many input strings, as tokenize() would each of them.
+        
+        The scanner runs over the inputs via map() and all tokens are
+        validated with one set check, so there is no per-input Python call
+        overhead on the success path.
+        
+        Args:
+            inputs: Input strings to tokenize
+            
+        Returns:
+            One token list (with '$' appended) per input
+            
+        Raises:
+            ValueError: For the first input containing an unknown token
+        """
+        results = list(map(self._token_re.findall, inputs))
+        
+        if not self._terminals_set.issuperset(chain.from_iterable(results)):
+            # Report the first unknown token as tokenize() would
+            for input_string in inputs:
+                self._tokenize(input_string)
+        
+        for tokens in results:
+            tokens.append(_END_TOKEN)
+        return results
+    
     def tokenize_simple(self, input_string: str) -> List[str]:
         """
         Simple tokenization - split by whitespace and operators.
@@ -81,47 +187,43 @@ class Tokenizer:
         Returns:
             List of tokens
         """
-        if not input_string.strip():
-            return ['$']
-        
-        # Common operators that should be split
-        operators = ['+', '-', '*', '/', '(', ')', '=', ',', ';', ':', '.', '&', '|', '!', '<', '>']
-        
-        # First, split by whitespace
-        parts = input_string.split()
         tokens = []
+        self.tokenize_into(input_string, tokens)
+        return tokens
+    
+    def tokenize_into(self, input_string: str, tokens: List[str], ids: Optional[array] = None):
+        """
+        Like tokenize_simple, but appends the tokens (and '$') to an existing
+        list, so callers can reuse one buffer across inputs.
         
-        for part in parts:
-            if not part.strip():
-                continue
-            
-            # Check if part contains operators
-            current_token = ''
-            i = 0
-            
-            while i < len(part):
-                char = part[i]
-                
-                # If it's an operator, add current token (if any) and the operator
-                if char in operators:
-                    if current_token:
-                        tokens.append(current_token)
-                        current_token = ''
-                    tokens.append(char)
-                else:
-                    current_token += char
-                
-                i += 1
-            
-            # Add remaining token
-            if current_token:
-                tokens.append(current_token)
+        Args:
+            input_string: Input string to tokenize
+            tokens: List to append tokens to. On ValueError it may hold
+                    part of the tokens.
+            ids: Optional array to append the tokens' terminal ids (see
+                 terminal_ids) to, likewise
+        """
+        # Operators, and maximal runs of anything else except whitespace,
+        # found in one C-level pass
+        new_tokens = _SIMPLE_TOKEN_RE.findall(input_string)
+        tokens.extend(new_tokens)
         
-        # Validate tokens
-        for token in tokens:
-            if token not in self.terminals and token != '$':
-                raise ValueError(f"Unknown token: '{token}'. Valid terminals: {self.terminals}")
+        # Validate tokens (per token only if some token is not a terminal);
+        # with ids, the id lookup is the validation
+        if ids is None:
+            valid = self._terminals_set.issuperset(new_tokens)
+        else:
+            try:
+                ids.extend(map(self.terminal_ids.__getitem__, new_tokens))
+                valid = True
+            except KeyError:
+                valid = False
+        if not valid:
+            terminals_set = self._terminals_set
+            for token in new_tokens:
+                if token not in terminals_set and token != _END_TOKEN:
+                    raise ValueError(f"Unknown token: '{token}'. Valid terminals: {self.terminals}")
         
-        tokens.append('$')
-        return tokens
-
+        tokens.append(_END_TOKEN)
+        if ids is not None:
+            ids.append(self.terminal_ids[_END_TOKEN])